@@ -8,6 +8,7 @@ import asyncio
 import os
 import threading
 import time
+from collections import deque
 from dataclasses import asdict, dataclass
 from datetime import timedelta
 from typing import Any
@@ -26,6 +27,29 @@ except ImportError:
     PROMETHEUS_AVAILABLE = False
     logger.warning("Prometheus client not available, metrics will be logged only")
 
+# GPU availability cannot change for the lifetime of the process
+CUDA_AVAILABLE = torch.cuda.is_available()
+
+
+def _read_cuda_gpu_metrics() -> tuple[float, float]:
+    """Return (used GPU memory in GB, utilization percent) for the first GPU"""
+    # cudaMemGetInfo is device-wide: it counts allocator-reserved blocks and other processes
+    free_bytes, total_bytes = torch.cuda.mem_get_info()
+    gpu_memory_gb = (total_bytes - free_bytes) / (1024**3)
+
+    gpus = GPUtil.getGPUs()
+    gpu_utilization_percent = gpus[0].load * 100 if gpus else 0.0
+    return gpu_memory_gb, gpu_utilization_percent
+
+
+def _read_no_gpu_metrics() -> tuple[float, float]:
+    """CPU-only hosts have no GPU metrics to report"""
+    return 0.0, 0.0
+
+
+# Picked once at import so CPU-only runs never probe CUDA or spawn nvidia-smi
+read_gpu_metrics = _read_cuda_gpu_metrics if CUDA_AVAILABLE else _read_no_gpu_metrics
+
 
 @dataclass
 class HealthMetrics:
@@ -62,14 +86,33 @@ class RequestMetrics:
 class HealthMonitor:
     """Comprehensive health monitoring for RunPod serverless deployment"""
 
+    # (metric, limit) pairs; exceeding any one marks the deployment as degraded
+    DEGRADED_THRESHOLDS: tuple[tuple[str, float], ...] = (
+        ("memory_usage_gb", 15.0),
+        ("gpu_memory_gb", 10.0),
+        ("error_rate", 20.0),
+    )
+    # Error rate is too noisy to act on before this many requests
+    MIN_REQUESTS_FOR_ERROR_RATE = 10
+
     def __init__(self, port: int = 9090):
         self.port = port
         self.start_time = time.time()
-        self.request_history: list[RequestMetrics] = []
+        self.max_history_size = 1000
+        self.request_history: deque[RequestMetrics] = deque(maxlen=self.max_history_size)
         self.total_requests = 0
         self.successful_requests = 0
         self.failed_requests = 0
 
+        # Running totals over completed requests in request_history, so averages are O(1)
+        self._completed_duration_sum = 0.0
+        self._completed_count = 0
+
+        # `du` over /app is expensive and the size rarely changes; cache it as (monotonic_ts, size_gb)
+        self._container_size_ttl = 300.0
+        self._container_size_cache: tuple[float, float] | None = None
+        self._static_system_info: dict[str, Any] | None = None
+
         # Thread-safe metrics
         self._metrics_lock = threading.RLock()
         self._active_requests_count = 0
@@ -150,7 +193,7 @@ class HealthMonitor:
         """Cleanup old metrics periodically"""
         while True:
             try:
-                await self._cleanup_old_metrics()
+                self._cleanup_old_metrics()
                 await asyncio.sleep(300)  # Cleanup every 5 minutes
             except Exception as e:
                 logger.error(f"Cleanup error: {e}")
@@ -160,12 +203,15 @@ class HealthMonitor:
         """Clean up old metrics data"""
         current_time = time.time()
         with self._metrics_lock:
-            # Keep only last 1000 requests
-            if len(self.request_history) > 1000:
-                self.request_history = self.request_history[-1000:]
+            # Remove requests older than 1 hour; history is in start order, so they sit at the left end
+            while self.request_history and current_time - self.request_history[0].start_time >= 3600:
+                self._forget_request(self.request_history.popleft())
 
-            # Remove requests older than 1 hour
-            self.request_history = [req for req in self.request_history if current_time - req.start_time < 3600]
+    def _forget_request(self, request: RequestMetrics):
+        """Drop an evicted request from the running totals (caller holds the lock)"""
+        if request.duration is not None:
+            self._completed_duration_sum -= request.duration
+            self._completed_count -= 1
 
     def collect_metrics(self) -> HealthMetrics:
         """Collect current health metrics"""
@@ -179,12 +225,7 @@ class HealthMonitor:
             gpu_utilization_percent = 0.0
 
             try:
-                if torch.cuda.is_available():
-                    gpus = GPUtil.getGPUs()
-                    if gpus:
-                        gpu = gpus[0]  # Use first GPU
-                        gpu_memory_gb = gpu.memoryUsed / 1024  # MB to GB
-                        gpu_utilization_percent = gpu.load * 100
+                gpu_memory_gb, gpu_utilization_percent = read_gpu_metrics()
             except Exception as e:
                 logger.warning(f"GPU metrics collection failed: {e}")
 
@@ -197,17 +238,14 @@ class HealthMonitor:
                 total_requests = self.total_requests
                 error_rate = (self.failed_requests / total_requests * 100) if total_requests > 0 else 0.0
 
-                # Calculate average response time
-                completed_requests = [r for r in self.request_history if r.duration is not None]
+                # Average response time from running totals
                 avg_response_time = (
-                    sum(r.duration for r in completed_requests) / len(completed_requests)
-                    if completed_requests
-                    else 0.0
+                    self._completed_duration_sum / self._completed_count if self._completed_count else 0.0
                 )
 
             return HealthMetrics(
                 timestamp=time.time(),
-                status=self._get_health_status(memory_usage_gb, gpu_memory_gb),
+                status=self._get_health_status(memory_usage_gb, gpu_memory_gb, error_rate, total_requests),
                 memory_usage_gb=memory_usage_gb,
                 gpu_memory_gb=gpu_memory_gb,
                 gpu_utilization_percent=gpu_utilization_percent,
@@ -236,7 +274,17 @@ class HealthMonitor:
             )
 
     def _get_container_size(self) -> float:
-        """Estimate container size in GB"""
+        """Estimate container size in GB, rescanning at most once per TTL"""
+        now = time.monotonic()
+        if self._container_size_cache is not None and now - self._container_size_cache[0] < self._container_size_ttl:
+            return self._container_size_cache[1]
+
+        size_gb = self._measure_container_size()
+        self._container_size_cache = (now, size_gb)
+        return size_gb
+
+    def _measure_container_size(self) -> float:
+        """Measure container size in GB with `du`"""
         try:
             # Check container size by examining app directory
             result = os.popen("du -sh /app 2>/dev/null || echo '0'").read().strip()
@@ -253,41 +301,46 @@ class HealthMonitor:
         except:
             return 0.0
 
-    def _get_health_status(self, memory_gb: float, gpu_memory_gb: float) -> str:
-        """Determine overall health status"""
-        # Check memory usage
-        if memory_gb > 15:  # High memory usage
-            return "degraded"
-
-        # Check GPU memory
-        if gpu_memory_gb > 10:  # High GPU memory
-            return "degraded"
-
-        # Check error rate
-        with self._metrics_lock:
-            if self.total_requests > 10:
-                recent_error_rate = (self.failed_requests / self.total_requests) * 100
-                if recent_error_rate > 20:  # High error rate
-                    return "degraded"
+    def _get_health_status(
+        self, memory_gb: float, gpu_memory_gb: float, error_rate: float, total_requests: int
+    ) -> str:
+        """Determine overall health status from already-collected readings"""
+        observed = {
+            "memory_usage_gb": memory_gb,
+            "gpu_memory_gb": gpu_memory_gb,
+            "error_rate": error_rate if total_requests > self.MIN_REQUESTS_FOR_ERROR_RATE else 0.0,
+        }
+        for metric, limit in self.DEGRADED_THRESHOLDS:
+            if observed[metric] > limit:
+                return "degraded"
 
         return "healthy"
 
     def _check_models_loaded(self) -> bool:
         """Check if models are loaded"""
         try:
-            return torch.cuda.is_available() and torch.cuda.memory_allocated() > 0
+            return CUDA_AVAILABLE and torch.cuda.memory_allocated() > 0
         except:
             return False
 
     def _log_metrics(self, metrics: HealthMetrics):
         """Log metrics to stdout"""
+        # Positional args let loguru skip formatting entirely when no sink accepts INFO
         logger.info(
-            f"Health Check: {metrics.status} | "
-            f"Memory: {metrics.memory_usage_gb:.1f}GB | "
-            f"GPU: {metrics.gpu_memory_gb:.1f}GB ({metrics.gpu_utilization_percent:.1f}%) | "
-            f"Requests: {metrics.active_requests} active, {metrics.total_requests} total | "
-            f"Error Rate: {metrics.error_rate:.1f}% | "
-            f"Avg Response: {metrics.average_response_time:.2f}s"
+            "Health Check: {} | "
+            "Memory: {:.1f}GB | "
+            "GPU: {:.1f}GB ({:.1f}%) | "
+            "Requests: {} active, {} total | "
+            "Error Rate: {:.1f}% | "
+            "Avg Response: {:.2f}s",
+            metrics.status,
+            metrics.memory_usage_gb,
+            metrics.gpu_memory_gb,
+            metrics.gpu_utilization_percent,
+            metrics.active_requests,
+            metrics.total_requests,
+            metrics.error_rate,
+            metrics.average_response_time,
         )
 
     def _update_prometheus_metrics(self, metrics: HealthMetrics):
@@ -309,6 +362,9 @@ class HealthMonitor:
             request = RequestMetrics(
                 request_id=request_id, start_time=time.time(), voice_used=voice, text_length=text_length
             )
+            # The deque evicts the oldest entry itself; just keep the running totals in step
+            if len(self.request_history) == self.max_history_size:
+                self._forget_request(self.request_history[0])
             self.request_history.append(request)
 
     def end_request(
@@ -331,6 +387,9 @@ class HealthMonitor:
                     request.error_message = error_message
                     request.audio_duration = audio_duration
 
+                    self._completed_duration_sum += request.duration
+                    self._completed_count += 1
+
                     if success:
                         self.successful_requests += 1
                     else:
@@ -354,12 +413,19 @@ class HealthMonitor:
         metrics = self.collect_metrics()
         uptime = time.time() - self.start_time
 
+        # Single pass over the last hour of requests
+        now = time.time()
+        recent_count = recent_successes = 0
+        recent_duration_sum = 0.0
         with self._metrics_lock:
-            recent_requests = [r for r in self.request_history if time.time() - r.start_time < 3600]
+            for r in self.request_history:
+                if now - r.start_time < 3600:
+                    recent_count += 1
+                    recent_successes += r.success
+                    if r.duration:
+                        recent_duration_sum += r.duration
 
-            recent_success_rate = (
-                sum(1 for r in recent_requests if r.success) / len(recent_requests) * 100 if recent_requests else 100.0
-            )
+        recent_success_rate = recent_successes / recent_count * 100 if recent_count else 100.0
 
         return {
             "status": metrics.status,
@@ -367,13 +433,9 @@ class HealthMonitor:
             "uptime_formatted": str(timedelta(seconds=int(uptime))),
             "metrics": asdict(metrics),
             "recent_performance": {
-                "requests_last_hour": len(recent_requests),
+                "requests_last_hour": recent_count,
                 "success_rate_last_hour": recent_success_rate,
-                "average_duration_last_hour": (
-                    sum(r.duration for r in recent_requests if r.duration) / len(recent_requests)
-                    if recent_requests and any(r.duration for r in recent_requests)
-                    else 0.0
-                ),
+                "average_duration_last_hour": recent_duration_sum / recent_count if recent_duration_sum else 0.0,
             },
             "version": "1.0.0",
             "monitoring_enabled": True,
@@ -410,35 +472,44 @@ class HealthMonitor:
 
     def _get_performance_by_voice(self) -> dict[str, dict[str, float]]:
         """Get performance metrics broken down by voice"""
+        # voice -> [request_count, duration_sum, success_count, audio_duration_sum], built in one pass
+        totals: dict[str, list[float]] = {}
         with self._metrics_lock:
-            voice_metrics = {}
-
-            for voice in set(r.voice_used for r in self.request_history if r.voice_used):
-                voice_requests = [r for r in self.request_history if r.voice_used == voice and r.duration]
-
-                if voice_requests:
-                    voice_metrics[voice] = {
-                        "request_count": len(voice_requests),
-                        "average_duration": sum(r.duration for r in voice_requests) / len(voice_requests),
-                        "success_rate": sum(1 for r in voice_requests if r.success) / len(voice_requests) * 100,
-                        "average_audio_duration": (
-                            sum(r.audio_duration or 0 for r in voice_requests) / len(voice_requests)
-                        ),
-                    }
+            for r in self.request_history:
+                if r.voice_used and r.duration:
+                    t = totals.setdefault(r.voice_used, [0, 0.0, 0, 0.0])
+                    t[0] += 1
+                    t[1] += r.duration
+                    t[2] += r.success
+                    t[3] += r.audio_duration or 0
 
-        return voice_metrics
+        return {
+            voice: {
+                "request_count": count,
+                "average_duration": duration_sum / count,
+                "success_rate": success_count / count * 100,
+                "average_audio_duration": audio_duration_sum / count,
+            }
+            for voice, (count, duration_sum, success_count, audio_duration_sum) in totals.items()
+        }
 
     def _get_system_info(self) -> dict[str, Any]:
         """Get system information"""
         try:
+            # These never change for the lifetime of the process, so collect them once
+            if self._static_system_info is None:
+                self._static_system_info = {
+                    "cpu_count": psutil.cpu_count(),
+                    "memory_total_gb": psutil.virtual_memory().total / (1024**3),
+                    "python_version": os.sys.version,
+                    "torch_version": torch.__version__,
+                    "cuda_available": CUDA_AVAILABLE,
+                    "cuda_version": torch.version.cuda if CUDA_AVAILABLE else None,
+                }
+
             return {
-                "cpu_count": psutil.cpu_count(),
-                "memory_total_gb": psutil.virtual_memory().total / (1024**3),
+                **self._static_system_info,
                 "disk_usage_gb": psutil.disk_usage("/").used / (1024**3),
-                "python_version": os.sys.version,
-                "torch_version": torch.__version__,
-                "cuda_available": torch.cuda.is_available(),
-                "cuda_version": torch.version.cuda if torch.cuda.is_available() else None,
                 "prometheus_enabled": self.prom_enabled,
             }
         except Exception as e:
@@ -133,21 +133,16 @@ class RunPodHiggsAudioServer:
             raise ValueError("S3 client not initialized")
 
         try:
-            # Convert to WAV bytes
-            audio_buffer = io.BytesIO()
-
-            # Convert numpy array to bytes for soundfile
-            import numpy as np
-
-            if isinstance(audio_data, np.ndarray):
-                sf.write(audio_buffer, audio_data, sample_rate, format="WAV")
+            # Already-encoded WAV bytes are uploaded as-is; only raw arrays go through soundfile
+            if isinstance(audio_data, (bytes, bytearray, memoryview)):
+                body = audio_data
             else:
-                audio_buffer.write(audio_data)
-
-            audio_buffer.seek(0)
+                audio_buffer = io.BytesIO()
+                sf.write(audio_buffer, audio_data, sample_rate, format="WAV")
+                body = audio_buffer.getvalue()
 
             # Upload to S3
-            self.s3_client.put_object(Bucket=bucket, Key=key, Body=audio_buffer.getvalue(), ContentType="audio/wav")
+            self.s3_client.put_object(Bucket=bucket, Key=key, Body=body, ContentType="audio/wav")
 
             s3_url = f"s3://{bucket}/{key}"
             logger.info(f"Audio uploaded to S3: {s3_url}")
@@ -289,17 +284,17 @@ def handler(event: dict[str, Any]) -> dict[str, Any]:
         # Calculate duration
         duration_seconds = len(response.audio_data) / response.sample_rate
 
+        # Encode WAV once; the same bytes serve the S3 upload and the base64 fallback
+        audio_buffer = io.BytesIO()
+        sf.write(audio_buffer, response.audio_data, response.sample_rate, format="WAV")
+        wav_bytes = audio_buffer.getvalue()
+
         # Handle S3 upload if requested
         audio_url = None
         if input_data.get("s3_bucket") and input_data.get("s3_key"):
             try:
-                # Convert to WAV bytes for S3 upload
-                audio_buffer = io.BytesIO()
-                sf.write(audio_buffer, response.audio_data, response.sample_rate, format="WAV")
-                audio_buffer.seek(0)
-
                 audio_url = server._upload_to_s3(
-                    audio_data=audio_buffer.getvalue(),
+                    audio_data=wav_bytes,
                     sample_rate=response.sample_rate,
                     bucket=input_data["s3_bucket"],
                     key=input_data["s3_key"],
@@ -330,10 +325,7 @@ def handler(event: dict[str, Any]) -> dict[str, Any]:
         # Add base64 audio data if not using S3
         if not audio_url:
             # Convert to base64 for direct response
-            audio_buffer = io.BytesIO()
-            sf.write(audio_buffer, response.audio_data, response.sample_rate, format="WAV")
-            audio_buffer.seek(0)
-            result["audio_data_b64"] = base64.b64encode(audio_buffer.getvalue()).decode()
+            result["audio_data_b64"] = base64.b64encode(wav_bytes).decode()
 
         logger.info(f"Generated {duration_seconds:.2f}s of audio successfully")
         return {"output": result}
@@ -182,6 +182,8 @@ class HiggsAudioModelClient:
         max_new_tokens=2048,
         kv_cache_lengths: list[int] = [1024, 4096, 8192],  # Multiple KV cache sizes,
         use_static_kv_cache=False,
+        torch_compile=False,
+        quant_mode=None,
     ):
         # Use explicit device if provided, otherwise try CUDA/MPS/CPU
         if device_id is not None:
@@ -213,6 +215,13 @@ class HiggsAudioModelClient:
             torch_dtype=torch.bfloat16,
         )
         self._model.eval()
+        if quant_mode in ("int8", "fp8"):
+            self._quantize_weights(quant_mode)
+        if torch_compile:
+            # Compile the transformer core before CUDA graph capture so the captured decode graphs replay
+            # Inductor's fused kernels. capture_model() owns graph capture, so Inductor's cudagraphs stay off;
+            # prefill length varies per request, hence dynamic shapes.
+            self._model._forward_core = torch.compile(self._model._forward_core, dynamic=True)
         self._kv_cache_lengths = kv_cache_lengths
         self._use_static_kv_cache = use_static_kv_cache
 
@@ -236,6 +245,31 @@ class HiggsAudioModelClient:
         if use_static_kv_cache:
             self._init_static_kv_cache()
 
+    def _quantize_weights(self, quant_mode):
+        """Weight-only quantization of the Linear layers; falls back to bf16 weights when it cannot apply
+
+        Decode is bound by weight reads, so halving the weight bytes speeds up every step. Has to happen before
+        compile and graph capture.
+        """
+        if quant_mode == "fp8":
+            # float8 matmuls need Ada/Hopper (sm_89+); older GPUs would only fail at the first matmul
+            is_cuda = str(self._device).startswith("cuda")
+            if not is_cuda or torch.cuda.get_device_capability(self._device) < (8, 9):
+                logger.warning("fp8 weights need a CUDA GPU with compute capability 8.9+, ignoring quant_mode=fp8")
+                return
+        try:
+            from torchao.quantization import quantize_
+
+            if quant_mode == "int8":
+                from torchao.quantization import int8_weight_only as weight_only
+            else:
+                from torchao.quantization import float8_weight_only as weight_only
+        except ImportError as e:
+            logger.warning(f"Cannot import torchao {quant_mode} quantization ({e}), ignoring quant_mode={quant_mode}")
+            return
+        quantize_(self._model, weight_only())
+        logger.info(f"Applied {quant_mode} weight-only quantization")
+
     def _init_static_kv_cache(self):
         cache_config = copy.deepcopy(self._model.config.text_config)
         cache_config.num_hidden_layers = self._model.config.text_config.num_hidden_layers
@@ -258,8 +292,13 @@ class HiggsAudioModelClient:
             self._model.capture_model(self.kv_caches.values())
 
     def _prepare_kv_caches(self):
-        for kv_cache in self.kv_caches.values():
-            kv_cache.reset()
+        # The model tracks the largest bucket the previous generation was promoted to. Buckets above it were
+        # never written and are still zeroed, so only reset the ones it may have touched. Until the first
+        # generation (graph capture writes into every bucket) this is None and everything is reset.
+        used_bucket = getattr(self._model, "current_past_key_values_bucket", None)
+        for length, kv_cache in self.kv_caches.items():
+            if used_bucket is None or length <= used_bucket:
+                kv_cache.reset()
 
     @torch.inference_mode()
     def generate(
@@ -274,6 +313,7 @@ class HiggsAudioModelClient:
         ras_win_len=7,
         ras_win_max_num_repeat=2,
         seed=123,
+        max_new_tokens=None,
         *args,
         **kwargs,
     ):
@@ -300,7 +340,8 @@ class HiggsAudioModelClient:
             input_tokens.extend(postfix)
 
             logger.info(f"========= Chunk {idx} Input =========")
-            logger.info(self._tokenizer.decode(input_tokens))
+            # Decoding the prompt is costly, so only do it when INFO is actually emitted
+            logger.opt(lazy=True).info("{}", lambda: self._tokenizer.decode(input_tokens))
             context_audio_ids = audio_ids + generated_audio_ids
 
             curr_sample = ChatMLDatasetSample(
@@ -332,7 +373,7 @@ class HiggsAudioModelClient:
             # Generate audio
             outputs = self._model.generate(
                 **batch,
-                max_new_tokens=self._max_new_tokens,
+                max_new_tokens=max_new_tokens or self._max_new_tokens,
                 use_cache=True,
                 do_sample=True,
                 temperature=temperature,
@@ -366,8 +407,9 @@ class HiggsAudioModelClient:
                 generated_audio_ids = generated_audio_ids[-generation_chunk_buffer_size:]
                 generation_messages = generation_messages[(-2 * generation_chunk_buffer_size) :]
 
+        text_result = self._tokenizer.decode(outputs[0][0])
         logger.info("========= Final Text output =========")
-        logger.info(self._tokenizer.decode(outputs[0][0]))
+        logger.info(text_result)
         concat_audio_out_ids = torch.concat(audio_out_ids_l, dim=1)
 
         # Fix MPS compatibility: detach and move to CPU before decoding
@@ -377,7 +419,6 @@ class HiggsAudioModelClient:
             concat_audio_out_ids_cpu = concat_audio_out_ids
 
         concat_wv = self._audio_tokenizer.decode(concat_audio_out_ids_cpu.unsqueeze(0))[0, 0]
-        text_result = self._tokenizer.decode(outputs[0][0])
         return concat_wv, sr, text_result
 
 
@@ -5,20 +5,29 @@ Ultra-thin serverless endpoint for audio generation with voice cloning,
 LLM tone control, and S3 output storage.
 """
 
+import asyncio
+import copy
+import functools
 import gc
+import hashlib
 import json
 import os
+import re
 import sys
+import tempfile
+import threading
 import time
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
 from io import BytesIO
-from pathlib import Path
 from typing import Any
 
 import boto3
-import re
+import numpy as np
+import psutil
 import soundfile as sf
 import torch
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config as BotoConfig
 from loguru import logger
 
 from boson_multimodal.audio_processing.higgs_audio_tokenizer import load_higgs_audio_tokenizer
@@ -30,17 +39,37 @@ from boson_multimodal.audio_processing.higgs_audio_tokenizer import load_higgs_a
 # Import generation utilities (needs sys.path modification first)
 sys.path.append("/app/examples")
 from generation import (
+    AUDIO_PLACEHOLDER_TOKEN,
     HiggsAudioModelClient,
+    _build_system_message_with_audio_prompt,
     normalize_chinese_punctuation,
     prepare_chunk_text,
     prepare_generation_context,
 )
+from generation import CURR_DIR as GENERATION_DIR
 
 
 # Configuration
 MODEL_PATH = os.getenv("MODEL_PATH", "/runpod-volume/higgs_audio/bosonai/higgs-audio-v2-generation-3B-base")
 TOKENIZER_PATH = os.getenv("TOKENIZER_PATH", "/runpod-volume/higgs_audio/bosonai/higgs-audio-v2-tokenizer")
 VOICE_PROMPTS_PATH = os.getenv("VOICE_PROMPTS_PATH", "/runpod-volume/higgs_audio/voice_prompts")
+HIGGS_COMPILE = os.getenv("HIGGS_COMPILE", "1") == "1"
+WARMUP_ON_IMPORT = os.getenv("WARMUP_ON_IMPORT", "1") == "1"
+QUANT_MODE = os.getenv("QUANT_MODE", "none")  # int8 | fp8 | none (weight-only, needs torchao)
+AUDIO_CACHE_DIR = os.getenv("AUDIO_CACHE_DIR", "")  # opt-in; empty disables the cache
+AUDIO_CACHE_TTL = int(os.getenv("AUDIO_CACHE_TTL", "86400"))
+AUDIO_CACHE_MAX_ENTRIES = int(os.getenv("AUDIO_CACHE_MAX_ENTRIES", "256"))
+CLEANUP_EVERY_N_REQUESTS = int(os.getenv("CLEANUP_EVERY_N_REQUESTS", "50"))
+GC_RSS_THRESHOLD_GB = float(os.getenv("GC_RSS_THRESHOLD_GB", "8"))
+
+# Persist Inductor artifacts on the network volume so cold starts reuse compiled kernels
+os.environ.setdefault("TORCHINDUCTOR_CACHE_DIR", "/runpod-volume/.inductor")
+# Grow allocator segments in place instead of emptying the cache between requests (read at first CUDA alloc)
+os.environ.setdefault("PYTORCH_CUDA_ALLOC_CONF", "expandable_segments:True,max_split_size_mb:512")
+
+# TF32 for the fp32 GEMMs/convs (audio tokenizer, any non-bf16 layers) on Ampere+
+torch.backends.cuda.matmul.allow_tf32 = True
+torch.backends.cudnn.allow_tf32 = True
 
 # Global variables for caching
 _model_cache = None
@@ -48,8 +77,147 @@ _tokenizer_cache = None
 _audio_tokenizer_cache = None
 _collator_cache = None
 _voice_prompts_cache = None
-_last_access_time = None
-_memory_cleanup_threshold = 300  # 5 minutes
+_voice_prompts_mtime = None  # mtime of VOICE_PROMPTS_PATH when _voice_prompts_cache was built
+_voice_tokens_cache = {}  # wav path in VOICE_PROMPTS_PATH -> (file stamp, audio token tensor)
+_voice_tokens_lock = threading.Lock()
+_voice_tokens_mtime = None  # mtime of VOICE_PROMPTS_PATH when deleted voices were last evicted
+
+# Returned when VOICE_PROMPTS_PATH has no usable voices
+_DEFAULT_VOICE_SUGGESTIONS = (
+    {"name": "belinda", "description": "Female voice with warm tone"},
+    {"name": "chadwick", "description": "Male voice with deep tone"},
+    {"name": "daffy", "description": "Animated character voice"},
+    {"name": "elsa", "description": "Female voice with clear articulation"},
+    {"name": "jorts", "description": "Male voice with casual tone"},
+)
+
+# S3 uploads: single PUT below the threshold, parallel multipart above it
+_S3_MULTIPART_THRESHOLD = 5 * 1024 * 1024
+_S3_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=_S3_MULTIPART_THRESHOLD,
+    multipart_chunksize=_S3_MULTIPART_THRESHOLD,
+    max_concurrency=8,
+    use_threads=True,
+)
+
+# One S3 client per process so warm containers reuse pooled TCP/TLS connections
+_s3_client = None
+_s3_client_lock = threading.Lock()
+_S3_CLIENT_CONFIG = BotoConfig(
+    max_pool_connections=64,
+    retries={"max_attempts": 5, "mode": "adaptive"},
+    tcp_keepalive=True,
+)
+
+
+def get_s3_client():
+    """Return the shared S3 client, creating it on first use"""
+    global _s3_client
+
+    if _s3_client is None:
+        with _s3_client_lock:
+            if _s3_client is None:
+                _s3_client = boto3.client(
+                    "s3",
+                    aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
+                    aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
+                    region_name=os.getenv("AWS_DEFAULT_REGION", "us-east-1"),
+                    config=_S3_CLIENT_CONFIG,
+                )
+    return _s3_client
+
+
+# Transcript normalization, compiled once
+_SPEAKER_RE = re.compile(r"\[(SPEAKER\d+)\]")
+_TRANSCRIPT_REPLACEMENTS = {
+    "(": " ",
+    ")": " ",
+    "°F": " degrees Fahrenheit",
+    "°C": " degrees Celsius",
+    "[laugh]": "<SE>[Laughter]</SE>",
+    "[humming start]": "<SE_s>[Humming]</SE_s>",
+    "[humming end]": "<SE_e>[Humming]</SE_e>",
+    "[music start]": "<SE_s>[Music]</SE_s>",
+    "[music end]": "<SE_e>[Music]</SE_e>",
+    "[music]": "<SE>[Music]</SE>",
+    "[sing start]": "<SE_s>[Singing]</SE_s>",
+    "[sing end]": "<SE_e>[Singing]</SE_e>",
+    "[applause]": "<SE>[Applause]</SE>",
+    "[cheering]": "<SE>[Cheering]</SE>",
+    "[cough]": "<SE>[Cough]</SE>",
+}
+# Longest keys first so the alternation never prefers a shorter overlapping tag
+_TRANSCRIPT_RE = re.compile("|".join(re.escape(k) for k in sorted(_TRANSCRIPT_REPLACEMENTS, key=len, reverse=True)))
+# Whitespace cleanup keeps line breaks (speaker chunking splits on them) but drops blank lines
+_LINE_BREAK_RE = re.compile(r"\s*\n\s*")
+_INLINE_SPACE_RE = re.compile(r"[^\S\n]+")
+_END_PUNCT = (".", "!", "?", ",", ";", '"', "'", "</SE_e>", "</SE>")
+
+
+def _file_stamp(path: str) -> tuple:
+    """(path, mtime, size) of a file, with None for both when it does not exist"""
+    try:
+        st = os.stat(path)
+        return (path, st.st_mtime_ns, st.st_size)
+    except OSError:
+        return (path, None, None)
+
+
+def _voice_prompt_stamp(ref_audio: str | None) -> tuple:
+    """(mtime, size) of every file prepare_generation_context reads for ref_audio"""
+    if ref_audio is None:
+        return ()
+    prompt_dir = os.path.join(GENERATION_DIR, "voice_prompts")
+    paths = []
+    for name in ref_audio.split(","):
+        if name.startswith("profile:"):
+            paths.append(os.path.join(prompt_dir, "profile.yaml"))
+        else:
+            paths.append(os.path.join(prompt_dir, f"{name}.wav"))
+            paths.append(os.path.join(prompt_dir, f"{name}.txt"))
+    return tuple(_file_stamp(path) for path in paths)
+
+
+def _volume_voice_paths(ref_audio: str | None) -> list[str] | None:
+    """Voice wavs in VOICE_PROMPTS_PATH for every name in ref_audio, or None unless all of them are there"""
+    if not ref_audio:
+        return None
+    paths = []
+    for name in ref_audio.split(","):
+        # Plain voice names only, never paths
+        if os.path.basename(name) != name:
+            return None
+        path = os.path.join(VOICE_PROMPTS_PATH, f"{name}.wav")
+        if not os.path.isfile(path):
+            return None
+        paths.append(path)
+    return paths
+
+
+@functools.lru_cache(maxsize=64)
+def _cached_generation_context(
+    scene_prompt, ref_audio, ref_audio_in_system_message, audio_tokenizer, speaker_tags, _stamp
+):
+    return prepare_generation_context(
+        scene_prompt=scene_prompt,
+        ref_audio=ref_audio,
+        ref_audio_in_system_message=ref_audio_in_system_message,
+        audio_tokenizer=audio_tokenizer,
+        speaker_tags=list(speaker_tags),
+    )
+
+
+def get_generation_context(scene_prompt, ref_audio, ref_audio_in_system_message, audio_tokenizer, speaker_tags):
+    """Memoized prepare_generation_context; re-encodes voice prompts only when their files change"""
+    messages, audio_ids = _cached_generation_context(
+        scene_prompt,
+        ref_audio,
+        ref_audio_in_system_message,
+        audio_tokenizer,
+        tuple(speaker_tags),
+        _voice_prompt_stamp(ref_audio),
+    )
+    return copy.deepcopy(messages), list(audio_ids)
 
 
 @dataclass
@@ -84,7 +252,7 @@ class GenerationResponse:
     text_output: str | None = None
     metadata: dict[str, Any] | None = None
     error: str | None = None
-    voice_suggestions: list[dict[str, str]] | None = None
+    voice_suggestions: tuple[dict[str, str], ...] | None = None
 
 
 class ModelManager:
@@ -96,7 +264,7 @@ class ModelManager:
         self.device = self._get_device()
         self.model_client = None
         self.audio_tokenizer = None
-        self.last_cleanup = time.time()
+        self.requests_since_cleanup = 0
 
     def _get_device(self) -> str:
         """Determine optimal device"""
@@ -119,72 +287,152 @@ class ModelManager:
             _audio_tokenizer_cache = load_higgs_audio_tokenizer(self.tokenizer_path, device=device_for_tokenizer)
             self.audio_tokenizer = _audio_tokenizer_cache
 
-            # Initialize model client
-            _model_cache = HiggsAudioModelClient(
-                model_path=self.model_path,
-                audio_tokenizer=self.audio_tokenizer,
-                device=self.device,
-                max_new_tokens=2048,
-                use_static_kv_cache="cuda" in self.device,
-            )
-            self.model_client = _model_cache
-
-            # Cache voice prompts
+            # Initialize model client, falling back to eager if compilation or graph capture fails
+            self.model_client = None
+            if HIGGS_COMPILE and "cuda" in self.device:
+                try:
+                    self._load_client(torch_compile=True)
+                except Exception as e:
+                    logger.error(f"Compiled model failed to load or warm up, falling back to eager: {e}")
+                    self.model_client = None
+            if self.model_client is None:
+                # Outside the except block, so a failed compiled attempt no longer pins its GPU memory
+                gc.collect()
+                if "cuda" in self.device:
+                    torch.cuda.empty_cache()
+                self._load_client(torch_compile=False)
+
+            # Cache voice prompt metadata; audio tokens are encoded on first use
             self._load_voice_prompts()
 
+            # Published last, so a failed load is retried by the next initialize() call
+            _model_cache = self.model_client
             logger.info("Models loaded successfully")
 
+    def _load_client(self, torch_compile: bool):
+        """Build the model client and warm it up; compile and CUDA graph capture errors surface here"""
+        self.model_client = HiggsAudioModelClient(
+            model_path=self.model_path,
+            audio_tokenizer=self.audio_tokenizer,
+            device=self.device,
+            max_new_tokens=2048,
+            use_static_kv_cache="cuda" in self.device,
+            torch_compile=torch_compile,
+            quant_mode=QUANT_MODE if "cuda" in self.device else None,
+        )
+
+        # Populate CUDA kernels (and the compile cache) here rather than on the first real request
+        if "cuda" in self.device:
+            try:
+                self._warmup()
+            except Exception as e:
+                if torch_compile:
+                    raise
+                logger.error(f"Model warmup failed: {e}")
+
+    def _warmup(self):
+        """Run a tiny generation to load CUDA kernels and trigger compilation"""
+        logger.info("Warming up model...")
+        warmup_start = time.perf_counter()
+        messages, audio_ids = prepare_generation_context(
+            scene_prompt=None,
+            ref_audio=None,
+            ref_audio_in_system_message=False,
+            audio_tokenizer=self.audio_tokenizer,
+            speaker_tags=[],
+        )
+        self.model_client.generate(
+            messages=messages,
+            audio_ids=audio_ids,
+            chunked_text=["Hello."],
+            generation_chunk_buffer_size=None,
+            seed=0,
+            max_new_tokens=16,
+        )
+        logger.info(f"Warmup completed in {time.perf_counter() - warmup_start:.2f}s")
+
     def _load_voice_prompts(self):
-        """Load voice prompts for suggestions"""
-        global _voice_prompts_cache
-
-        if _voice_prompts_cache is None:
-            voice_prompts_dir = Path(VOICE_PROMPTS_PATH)
-            if voice_prompts_dir.exists():
-                _voice_prompts_cache = []
-                for wav_file in voice_prompts_dir.glob("*.wav"):
-                    voice_name = wav_file.stem
-                    txt_file = wav_file.with_suffix(".txt")
-                    if txt_file.exists():
-                        _voice_prompts_cache.append(
-                            {
-                                "name": voice_name,
-                                "description": f"Voice: {voice_name}",
-                                "audio_path": str(wav_file),
-                                "text_path": str(txt_file),
-                            }
-                        )
-
-    def get_voice_suggestions(self) -> list[dict[str, str]]:
-        """Get available voice suggestions"""
-        if _voice_prompts_cache is None:
-            self._load_voice_prompts()
+        """Load voice prompts for suggestions, rescanning only when the directory changes"""
+        global _voice_prompts_cache, _voice_prompts_mtime
 
-        return _voice_prompts_cache or [
-            {"name": "belinda", "description": "Female voice with warm tone"},
-            {"name": "chadwick", "description": "Male voice with deep tone"},
-            {"name": "daffy", "description": "Animated character voice"},
-            {"name": "elsa", "description": "Female voice with clear articulation"},
-            {"name": "jorts", "description": "Male voice with casual tone"},
-        ]
+        try:
+            dir_mtime = os.stat(VOICE_PROMPTS_PATH).st_mtime_ns
+        except OSError:
+            return
+        if _voice_prompts_cache is not None and dir_mtime == _voice_prompts_mtime:
+            return
 
-    def cleanup_memory(self):
-        """Clean up GPU memory and unused resources"""
-        current_time = time.time()
-        if current_time - self.last_cleanup < 60:  # Don't cleanup too frequently
+        with os.scandir(VOICE_PROMPTS_PATH) as it:
+            entries = list(it)
+        wavs = {e.name[:-4]: e.path for e in entries if e.name.endswith(".wav")}
+        txts = {e.name[:-4]: e.path for e in entries if e.name.endswith(".txt")}
+        _voice_prompts_cache = tuple(
+            {
+                "name": voice_name,
+                "description": f"Voice: {voice_name}",
+                "audio_path": wavs[voice_name],
+                "text_path": txts[voice_name],
+            }
+            for voice_name in sorted(wavs.keys() & txts.keys())
+        )
+        _voice_prompts_mtime = dir_mtime
+
+    def get_voice_tokens(self, audio_paths: list[str]) -> list[torch.Tensor]:
+        """Audio tokens for each voice wav, encoded on first use and again whenever the file changes"""
+        tokens = []
+        with _voice_tokens_lock:
+            self._evict_deleted_voice_tokens()
+            for path in audio_paths:
+                stamp = _file_stamp(path)
+                cached = _voice_tokens_cache.get(path)
+                if cached is None or cached[0] != stamp:
+                    try:
+                        # The client concatenates context tokens on the CPU, so they are kept there
+                        with torch.inference_mode():
+                            audio_ids = self.audio_tokenizer.encode(path).cpu()
+                    except Exception as e:
+                        logger.warning(f"Failed to encode voice prompt {path}: {e}")
+                        audio_ids = None
+                    # Failures are cached too, so a bad file is not retried until it changes
+                    cached = _voice_tokens_cache[path] = (stamp, audio_ids)
+                if cached[1] is None:
+                    raise ValueError(f"Voice prompt {os.path.basename(path)} could not be encoded")
+                tokens.append(cached[1])
+        return tokens
+
+    def _evict_deleted_voice_tokens(self):
+        """Drop tokens of voice files removed since the last check; caller holds _voice_tokens_lock"""
+        global _voice_tokens_mtime
+
+        try:
+            dir_mtime = os.stat(VOICE_PROMPTS_PATH).st_mtime_ns
+        except OSError:
+            dir_mtime = None
+        if dir_mtime == _voice_tokens_mtime:
             return
+        for path in [path for path in _voice_tokens_cache if not os.path.exists(path)]:
+            del _voice_tokens_cache[path]
+        _voice_tokens_mtime = dir_mtime
 
-        logger.info("Performing memory cleanup...")
+    def get_voice_suggestions(self) -> tuple[dict[str, str], ...]:
+        """Get available voice suggestions (shared, rebuilt only when the voice directory changes)"""
+        self._load_voice_prompts()
 
-        # Clear CUDA cache if available
-        if torch.cuda.is_available():
-            torch.cuda.empty_cache()
-            torch.cuda.synchronize()
+        return _voice_prompts_cache or _DEFAULT_VOICE_SUGGESTIONS
 
-        # Force garbage collection
-        gc.collect()
+    def cleanup_memory(self):
+        """Collect host garbage every N requests, and only once RSS has grown past the threshold"""
+        self.requests_since_cleanup += 1
+        if self.requests_since_cleanup < CLEANUP_EVERY_N_REQUESTS:
+            return
+        self.requests_since_cleanup = 0
 
-        self.last_cleanup = current_time
+        rss_gb = psutil.Process().memory_info().rss / (1024**3)
+        if rss_gb < GC_RSS_THRESHOLD_GB:
+            return
+
+        logger.info(f"Performing memory cleanup (RSS {rss_gb:.2f} GB)...")
+        gc.collect()
         logger.info("Memory cleanup completed")
 
     def get_model_info(self) -> dict[str, Any]:
@@ -195,7 +443,8 @@ class ModelManager:
             "device": self.device,
             "models_loaded": self.model_client is not None,
             "voice_prompts_available": len(self.get_voice_suggestions()) if _voice_prompts_cache else 0,
-            "memory_cleanup_threshold": _memory_cleanup_threshold,
+            "cleanup_every_n_requests": CLEANUP_EVERY_N_REQUESTS,
+            "gc_rss_threshold_gb": GC_RSS_THRESHOLD_GB,
         }
 
 
@@ -209,28 +458,34 @@ class S3Uploader:
     def _initialize_client(self):
         """Initialize S3 client with credentials from environment"""
         try:
-            self.s3_client = boto3.client(
-                "s3",
-                aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-                aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
-                region_name=os.getenv("AWS_DEFAULT_REGION", "us-east-1"),
-            )
+            self.s3_client = get_s3_client()
         except Exception as e:
             logger.error(f"Failed to initialize S3 client: {e}")
             raise
 
-    async def upload_audio(self, audio_data: torch.Tensor, sample_rate: int, bucket: str, key: str) -> str:
-        """Upload audio data to S3"""
+    async def upload_audio(self, audio_data: np.ndarray, sample_rate: int, bucket: str, key: str) -> str:
+        """Upload audio data to S3 without blocking the event loop"""
+        return await asyncio.to_thread(self._upload_audio_sync, audio_data, sample_rate, bucket, key)
+
+    def _upload_audio_sync(self, audio_data: np.ndarray, sample_rate: int, bucket: str, key: str) -> str:
+        """Encode and upload audio data to S3 (blocking)"""
         try:
             # Convert audio to bytes
             audio_bytes = BytesIO()
-            sf.write(audio_bytes, audio_data, sample_rate)
+            # Pin the 16-bit PCM subtype explicitly rather than relying on the soundfile default for WAV
+            sf.write(audio_bytes, audio_data, sample_rate, format="WAV", subtype="PCM_16")
+            audio_size = audio_bytes.tell()
             audio_bytes.seek(0)
 
-            # Upload to S3
-            upload_start = time.time()
-            self.s3_client.put_object(Bucket=bucket, Key=key, Body=audio_bytes.getvalue(), ContentType="audio/wav")
-            upload_time = time.time() - upload_start
+            # Upload the buffer itself rather than a getvalue() copy
+            upload_start = time.perf_counter()
+            if audio_size < _S3_MULTIPART_THRESHOLD:
+                self.s3_client.put_object(Bucket=bucket, Key=key, Body=audio_bytes, ContentType="audio/wav")
+            else:
+                self.s3_client.upload_fileobj(
+                    audio_bytes, bucket, key, Config=_S3_TRANSFER_CONFIG, ExtraArgs={"ContentType": "audio/wav"}
+                )
+            upload_time = time.perf_counter() - upload_start
 
             url = f"s3://{bucket}/{key}"
             logger.info(f"Audio uploaded to S3 in {upload_time:.2f}s: {url}")
@@ -251,64 +506,174 @@ class S3Uploader:
             return False
 
 
+class AudioCache:
+    """Disk cache of generated audio for deterministic requests (fixed seed)"""
+
+    def __init__(self, cache_dir: str = AUDIO_CACHE_DIR):
+        self.cache_dir = cache_dir
+        if self.cache_dir:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+            except OSError as e:
+                logger.warning(f"Audio cache disabled, cannot create {self.cache_dir}: {e}")
+                self.cache_dir = ""
+
+    def key_for(self, request: GenerationRequest) -> str | None:
+        """Cache key covering every field that shapes the output, or None if the request is not cacheable"""
+        # Only a fixed seed pins every sampling path; temperature 0 alone still leaves RAS and top-k using the RNG
+        if not self.cache_dir or request.seed is None:
+            return None
+        params = asdict(request)
+        params.pop("s3_bucket")
+        params.pop("s3_key")
+        # Stamp whichever voice files generate_audio will actually read
+        voice_paths = _volume_voice_paths(request.ref_audio)
+        if voice_paths:
+            voice_stamp = tuple(_file_stamp(path) for path in voice_paths)
+        else:
+            voice_stamp = _voice_prompt_stamp(request.ref_audio)
+        payload = json.dumps([MODEL_PATH, params, voice_stamp], sort_keys=True)
+        return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        """Return the cached generation result, or None on a miss or expired entry"""
+        wav_path = os.path.join(self.cache_dir, f"{key}.wav")
+        try:
+            st = os.stat(wav_path)
+            if time.time() - st.st_mtime > AUDIO_CACHE_TTL:
+                return None
+            with open(os.path.join(self.cache_dir, f"{key}.json"), encoding="utf-8") as f:
+                meta = json.load(f)
+            audio_data, sample_rate = sf.read(wav_path, dtype="float32")
+            result = {
+                "audio_data": audio_data,
+                "sample_rate": sample_rate,
+                "text_output": meta["text_output"],
+                "duration_seconds": len(audio_data) / sample_rate,
+                "generation_time": 0.0,
+                "chunks_processed": meta["chunks_processed"],
+            }
+            # Bump atime for LRU eviction, keep mtime as the TTL anchor
+            os.utime(wav_path, (time.time(), st.st_mtime))
+        except (OSError, ValueError, RuntimeError, KeyError, TypeError):
+            # Missing, truncated or old-schema entries are treated as misses
+            return None
+
+        return result
+
+    def put(self, key: str, result: dict[str, Any]):
+        """Store a generation result and evict least recently used entries past the limit"""
+        wav_path = os.path.join(self.cache_dir, f"{key}.wav")
+        try:
+            # Metadata first; the wav is renamed into place last, so a visible wav always has its json
+            meta = {"text_output": result["text_output"], "chunks_processed": result["chunks_processed"]}
+            self._write_replace(
+                os.path.join(self.cache_dir, f"{key}.json"), lambda f: f.write(json.dumps(meta).encode("utf-8"))
+            )
+            self._write_replace(
+                wav_path,
+                lambda f: sf.write(f, result["audio_data"], result["sample_rate"], format="WAV", subtype="FLOAT"),
+            )
+            self._evict()
+        except (OSError, RuntimeError) as e:
+            logger.warning(f"Failed to write audio cache entry {key}: {e}")
+
+    def _write_replace(self, path: str, write):
+        """Write through a private temp file in the cache dir, then rename it over path"""
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def _evict(self):
+        """Drop expired entries, then the least recently used ones beyond AUDIO_CACHE_MAX_ENTRIES"""
+        now = time.time()
+        live = []
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if not entry.name.endswith(".wav"):
+                    continue
+                st = entry.stat()
+                if now - st.st_mtime > AUDIO_CACHE_TTL:
+                    self._remove(entry.name[:-4])
+                else:
+                    live.append((st.st_atime, entry.name[:-4]))
+        live.sort()
+        for _, key in live[: max(0, len(live) - AUDIO_CACHE_MAX_ENTRIES)]:
+            self._remove(key)
+
+    def _remove(self, key: str):
+        for suffix in (".wav", ".json"):
+            try:
+                os.remove(os.path.join(self.cache_dir, f"{key}{suffix}"))
+            except OSError:
+                pass
+
+
 class AudioGenerator:
     """Handles audio generation with voice cloning and tone control"""
 
     def __init__(self, model_manager: ModelManager):
         self.model_manager = model_manager
         self.voice_prompts_path = VOICE_PROMPTS_PATH
+        self.audio_cache = AudioCache()
+
+    def _cached_voice_context(self, scene_prompt: str | None, voice_paths: list[str]):
+        """Same context prepare_generation_context builds in system-message mode, from cached tokens"""
+        speaker_desc = "\n".join(f"SPEAKER{spk_id}: {AUDIO_PLACEHOLDER_TOKEN}" for spk_id in range(len(voice_paths)))
+        scene_desc = f"{scene_prompt}\n\n" if scene_prompt else ""
+        system_message = _build_system_message_with_audio_prompt(
+            f"Generate audio following instruction.\n\n<|scene_desc_start|>\n{scene_desc}{speaker_desc}\n<|scene_desc_end|>"
+        )
+        return [system_message], self.model_manager.get_voice_tokens(voice_paths)
 
     async def generate_audio(self, request: GenerationRequest) -> dict[str, Any]:
         """Generate audio with given parameters"""
 
+        # Deterministic requests are served from the disk cache when possible
+        cache_key = self.audio_cache.key_for(request)
+        if cache_key is not None:
+            cached = self.audio_cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"Audio cache hit: {cache_key}")
+                return cached
+
         # Normalize transcript
         transcript = normalize_chinese_punctuation(request.transcript)
 
         # Extract speaker tags if present
-        import re
-
-        pattern = re.compile(r"\[(SPEAKER\d+)\]")
-        speaker_tags = sorted(set(pattern.findall(transcript)))
-
-        # Additional text normalization
-        transcript = transcript.replace("(", " ")
-        transcript = transcript.replace(")", " ")
-        transcript = transcript.replace("°F", " degrees Fahrenheit")
-        transcript = transcript.replace("°C", " degrees Celsius")
-
-        # Apply sound effect replacements
-        for tag, replacement in [
-            ("[laugh]", "<SE>[Laughter]</SE>"),
-            ("[humming start]", "<SE_s>[Humming]</SE_s>"),
-            ("[humming end]", "<SE_e>[Humming]</SE_e>"),
-            ("[music start]", "<SE_s>[Music]</SE_s>"),
-            ("[music end]", "<SE_e>[Music]</SE_e>"),
-            ("[music]", "<SE>[Music]</SE>"),
-            ("[sing start]", "<SE_s>[Singing]</SE_s>"),
-            ("[sing end]", "<SE_e>[Singing]</SE_e>"),
-            ("[applause]", "<SE>[Applause]</SE>"),
-            ("[cheering]", "<SE>[Cheering]</SE>"),
-            ("[cough]", "<SE>[Cough]</SE>"),
-        ]:
-            transcript = transcript.replace(tag, replacement)
+        speaker_tags = sorted(set(_SPEAKER_RE.findall(transcript)))
+
+        # Symbol normalization and sound effect tags in a single pass
+        transcript = _TRANSCRIPT_RE.sub(lambda m: _TRANSCRIPT_REPLACEMENTS[m.group(0)], transcript)
 
         # Clean up lines
-        lines = transcript.split("\n")
-        transcript = "\n".join([" ".join(line.split()) for line in lines if line.strip()])
-        transcript = transcript.strip()
+        transcript = _LINE_BREAK_RE.sub("\n", transcript)
+        transcript = _INLINE_SPACE_RE.sub(" ", transcript).strip()
 
         # Add period if not ending with punctuation
-        if not any([transcript.endswith(c) for c in [".", "!", "?", ",", ";", '"', "'", "</SE_e>", "</SE>"]]):
+        if not transcript.endswith(_END_PUNCT):
             transcript += "."
 
-        # Prepare generation context
-        messages, audio_ids = prepare_generation_context(
-            scene_prompt=request.scene_prompt,
-            ref_audio=request.ref_audio,
-            ref_audio_in_system_message=True,  # Use system message for voice clarity
-            audio_tokenizer=self.model_manager.audio_tokenizer,
-            speaker_tags=speaker_tags,
-        )
+        # Voices on the volume use the token cache; anything else goes through prepare_generation_context
+        voice_paths = _volume_voice_paths(request.ref_audio)
+        if voice_paths:
+            messages, audio_ids = self._cached_voice_context(request.scene_prompt, voice_paths)
+        else:
+            messages, audio_ids = get_generation_context(
+                scene_prompt=request.scene_prompt,
+                ref_audio=request.ref_audio,
+                ref_audio_in_system_message=True,  # Use system message for voice clarity
+                audio_tokenizer=self.model_manager.audio_tokenizer,
+                speaker_tags=speaker_tags,
+            )
 
         # Prepare text chunking
         chunked_text = prepare_chunk_text(
@@ -321,7 +686,7 @@ class AudioGenerator:
         logger.info(f"Generating audio with {len(chunked_text)} chunks")
 
         # Generate audio
-        generation_start = time.time()
+        generation_start = time.perf_counter()
         concat_wv, sr, text_output = self.model_manager.model_client.generate(
             messages=messages,
             audio_ids=audio_ids,
@@ -334,12 +699,12 @@ class AudioGenerator:
             ras_win_max_num_repeat=request.ras_win_max_num_repeat,
             seed=request.seed,
         )
-        generation_time = time.time() - generation_start
+        generation_time = time.perf_counter() - generation_start
 
         # Calculate duration
         duration_seconds = len(concat_wv) / sr
 
-        return {
+        result = {
             "audio_data": concat_wv,
             "sample_rate": sr,
             "text_output": text_output,
@@ -347,6 +712,10 @@ class AudioGenerator:
             "generation_time": generation_time,
             "chunks_processed": len(chunked_text),
         }
+        if cache_key is not None:
+            self.audio_cache.put(cache_key, result)
+
+        return result
 
 
 class RequestValidator:
@@ -402,12 +771,22 @@ class ServerlessHandler:
         self.audio_generator = AudioGenerator(self.model_manager)
         self.request_validator = RequestValidator()
         self.initialized = False
+        # Startup warmup initializes on its own thread and event loop, apart from the request loop,
+        # so an asyncio lock cannot cover both
+        self._init_lock = threading.Lock()
 
     async def initialize(self):
-        """Initialize the handler"""
-        if not self.initialized:
-            await self.model_manager.initialize()
-            self.initialized = True
+        """Initialize the handler, waiting for an in-flight warmup instead of loading twice"""
+        if self.initialized:
+            return
+
+        await asyncio.to_thread(self._init_lock.acquire)
+        try:
+            if not self.initialized:
+                await self.model_manager.initialize()
+                self.initialized = True
+        finally:
+            self._init_lock.release()
 
     async def handle_request(self, event: dict) -> dict:
         """Handle incoming RunPod serverless request"""
@@ -433,16 +812,25 @@ class ServerlessHandler:
             # Generate audio
             generation_result = await self.audio_generator.generate_audio(request)
 
-            # Handle S3 upload if requested
-            audio_url = None
+            # Start the S3 upload right away so it overlaps with cleanup
+            upload_task = None
             if request.s3_bucket and request.s3_key:
-                try:
-                    audio_url = await self.s3_uploader.upload_audio(
+                upload_task = asyncio.create_task(
+                    self.s3_uploader.upload_audio(
                         generation_result["audio_data"],
                         generation_result["sample_rate"],
                         request.s3_bucket,
                         request.s3_key,
                     )
+                )
+
+            # Perform memory cleanup if needed
+            self.model_manager.cleanup_memory()
+
+            audio_url = None
+            if upload_task is not None:
+                try:
+                    audio_url = await upload_task
                 except Exception as e:
                     logger.error(f"S3 upload failed: {e}")
                     # Continue with local result
@@ -468,9 +856,6 @@ class ServerlessHandler:
                 voice_suggestions=self.model_manager.get_voice_suggestions(),
             )
 
-            # Perform memory cleanup if needed
-            self.model_manager.cleanup_memory()
-
             return {"output": response.__dict__}
 
         except Exception as e:
@@ -495,6 +880,14 @@ class ServerlessHandler:
 # Initialize global handler
 handler = ServerlessHandler()
 
+# One event loop for the life of the worker, so executor threads and pools survive between events
+_LOOP = asyncio.new_event_loop()
+threading.Thread(target=_LOOP.run_forever, name="handler-loop", daemon=True).start()
+
+# Load models at container start so the first request does not pay for it
+if WARMUP_ON_IMPORT:
+    threading.Thread(target=lambda: asyncio.run(handler.initialize()), name="model-warmup", daemon=True).start()
+
 
 async def handler_function(event: dict) -> dict:
     """Main handler function for RunPod serverless"""
@@ -509,10 +902,8 @@ async def handler_function(event: dict) -> dict:
 
 def run_handler(event: dict) -> dict:
     """Synchronous handler wrapper for RunPod"""
-    import asyncio
-
     try:
-        return asyncio.run(handler_function(event))
+        return asyncio.run_coroutine_threadsafe(handler_function(event), _LOOP).result()
     except Exception as e:
         logger.error(f"Handler execution failed: {e}")
         return {"output": GenerationResponse(success=False, error=f"Handler execution failed: {str(e)}").__dict__}
@@ -5,18 +5,21 @@ Ultra-optimized serverless endpoint for audio generation with voice cloning,
 LLM tone control, and S3 output storage. Optimized for <5GB container size.
 """
 
+import asyncio
+import contextlib
 import gc
 import json
 import os
+import re
+import struct
 import sys
 import time
 from dataclasses import dataclass
-from io import BytesIO
 from typing import Any
 
-import boto3
-import soundfile as sf
+import numpy as np
 import torch
+from aiobotocore.session import get_session
 from loguru import logger
 
 from boson_multimodal.audio_processing.higgs_audio_tokenizer import load_higgs_audio_tokenizer
@@ -29,6 +32,45 @@ from boson_multimodal.model.higgs_audio.modeling_higgs_audio import HiggsAudioMo
 MODEL_PATH = os.getenv("MODEL_PATH", "/runpod-volume/higgs_audio/bosonai/higgs-audio-v2-generation-3B-base")
 TOKENIZER_PATH = os.getenv("TOKENIZER_PATH", "/runpod-volume/higgs_audio/bosonai/higgs-audio-v2-tokenizer")
 VOICE_PROMPTS_PATH = os.getenv("VOICE_PROMPTS_PATH", "/runpod-volume/higgs_audio/voice_prompts")
+CLEANUP_EVERY_N_REQUESTS = int(os.getenv("CLEANUP_EVERY_N_REQUESTS", "50"))
+HIGGS_COMPILE = os.getenv("HIGGS_COMPILE", "1") == "1"
+WARMUP_ON_IMPORT = os.getenv("WARMUP_ON_IMPORT", "1") == "1"
+# CUDA graphs re-record on every new decode shape, so keep Inductor's fusion without them by default
+HIGGS_COMPILE_MODE = os.getenv("HIGGS_COMPILE_MODE", "max-autotune-no-cudagraphs")
+
+# Let the CUDA allocator grow segments in place instead of emptying its cache between requests
+os.environ.setdefault("PYTORCH_CUDA_ALLOC_CONF", "expandable_segments:True")
+
+# TF32 for whatever fp32 matmuls/convs remain outside the bfloat16 model (tokenizer, fp32 reductions)
+torch.set_float32_matmul_precision("high")
+torch.backends.cuda.matmul.allow_tf32 = True
+torch.backends.cudnn.allow_tf32 = True
+
+# S3 uploads above this size go up as concurrent multipart parts of this size
+S3_MULTIPART_CHUNK_SIZE = 8 * 1024 * 1024
+
+# Canonical 44-byte RIFF/WAVE header for uncompressed PCM
+_WAV_HEADER = struct.Struct("<4sI4s4sIHHIIHH4sI")
+
+# Transcript normalization, compiled once
+_NORMALIZE_REPLACEMENTS = {"(": " ", ")": " ", "°F": " degrees Fahrenheit", "°C": " degrees Celsius"}
+_NORMALIZE_RE = re.compile(r"[()]|°F|°C")
+# Line breaks are kept (blank lines dropped); other whitespace runs collapse to one space
+_LINE_BREAK_RE = re.compile(r"\s*\n\s*")
+_INLINE_SPACE_RE = re.compile(r"[^\S\n]+")
+_ENDING = (".", "!", "?", ",", ";", '"', "'")
+
+# Checked once at import; torch, loguru and (through HiggsAudioModel) transformers are already imported above
+try:
+    import soundfile  # noqa: F401
+
+    _PACKAGES_OK = True
+except ImportError as e:
+    _PACKAGES_OK = False
+    logger.error(f"Virtual environment package access failed: {e}")
+
+# "<|begin_of_text|>Hello." in the Llama 3 vocabulary the model's text backbone uses
+_WARMUP_INPUT_IDS = (128000, 9906, 13)
 
 # Global cache for optimized memory usage
 _model_cache = None
@@ -51,17 +93,17 @@ class OptimizedGenerationRequest:
     s3_key: str | None = None
 
 
-@dataclass
-class OptimizedGenerationResponse:
-    """Optimized response data model"""
-
-    success: bool
-    audio_url: str | None = None
-    duration_seconds: float | None = None
-    sample_rate: int = 24000
-    text_output: str | None = None
-    metadata: dict[str, Any] | None = None
-    error: str | None = None
+def _error_response(error: str) -> dict[str, Any]:
+    """Response payload for a failed request"""
+    return {
+        "success": False,
+        "audio_url": None,
+        "duration_seconds": None,
+        "sample_rate": 24000,
+        "text_output": None,
+        "metadata": None,
+        "error": error,
+    }
 
 
 class OptimizedModelManager:
@@ -72,6 +114,7 @@ class OptimizedModelManager:
         self.model = None
         self.audio_tokenizer = None
         self.initialized = False
+        self.compiled = False
 
     async def initialize(self):
         """Initialize models with lazy loading"""
@@ -86,69 +129,180 @@ class OptimizedModelManager:
 
             # Load model with optimizations
             if _model_cache is None:
-                logger.info("Loading model...")
-                _model_cache = HiggsAudioModel.from_pretrained(
-                    MODEL_PATH,
-                    device_map={"": self.device},
-                    torch_dtype=torch.bfloat16,
-                    low_cpu_mem_usage=True,
-                )
-                # Enable inference optimizations
-                _model_cache.eval()
-                if "cuda" in self.device:
-                    _model_cache = torch.compile(_model_cache, mode="reduce-overhead")
+                logger.info(f"Loading model (torch {torch.__version__})...")
+                # Load and compile under inference_mode so Dynamo traces the same mode generation runs in
+                with torch.inference_mode():
+                    _model_cache = HiggsAudioModel.from_pretrained(
+                        MODEL_PATH,
+                        device_map={"": self.device},
+                        torch_dtype=torch.bfloat16,
+                        low_cpu_mem_usage=True,
+                    )
+                    # Enable inference optimizations
+                    _model_cache.eval()
+                    if HIGGS_COMPILE and "cuda" in self.device:
+                        # Only the transformer core; the generate loop around it is Python control flow
+                        _model_cache._forward_core = torch.compile(
+                            _model_cache._forward_core, mode=HIGGS_COMPILE_MODE, dynamic=True
+                        )
+                        self.compiled = True
 
             self.model = _model_cache
+            # Compile and sanity-check here, whether loading at startup or on the first request
+            if "cuda" in self.device:
+                self.warmup()
             self.initialized = True
             logger.info("Optimized models loaded successfully")
 
+    def warmup(self):
+        """Run one prefill forward pass so Inductor compiles the transformer core before the first request
+
+        A compiled core that raises or produces non-finite logits is dropped in favour of the eager one.
+        """
+        input_ids = torch.tensor([_WARMUP_INPUT_IDS], device=self.device)
+
+        logger.info("Warming up model...")
+        warmup_start = time.perf_counter()
+        with torch.inference_mode():
+            try:
+                outputs = self.model(input_ids=input_ids, use_cache=True)
+                failure = None if torch.isfinite(outputs.logits).all() else "produced non-finite logits"
+            except Exception as e:
+                if not self.compiled:
+                    raise
+                failure = f"failed ({e})"
+            if failure is not None and self.compiled:
+                logger.error(f"Compiled model {failure} during warmup, falling back to eager")
+                self.disable_compile()
+                outputs = self.model(input_ids=input_ids, use_cache=True)
+        logger.info(f"Warmup completed in {time.perf_counter() - warmup_start:.2f}s")
+        return outputs
+
+    def disable_compile(self):
+        """Fall back to the eager transformer core"""
+        if self.compiled:
+            # The compiled core is an instance attribute shadowing the eager method
+            del self.model._forward_core
+            self.compiled = False
+
     def cleanup_memory(self):
-        """Aggressive memory cleanup"""
-        if torch.cuda.is_available():
-            torch.cuda.empty_cache()
-            torch.cuda.synchronize()
+        """Collect host garbage; the CUDA caching allocator keeps its blocks for the next request"""
         gc.collect()
 
 
+def encode_wav_pcm16(audio_data, sample_rate: int, ready: torch.cuda.Event | None = None) -> bytearray:
+    """Encode mono audio as a 16-bit PCM WAV, written straight into one preallocated buffer
+
+    Float samples in [-1, 1] are quantized here; int16 samples (already quantized on the GPU) are copied as is.
+    ``ready`` is waited on first when the samples are still being copied in from the device.
+    """
+    if ready is not None:
+        ready.synchronize()
+    if isinstance(audio_data, torch.Tensor):
+        audio_data = audio_data.detach()
+        if audio_data.dtype != torch.int16:
+            audio_data = audio_data.float()
+        audio_data = audio_data.cpu().numpy()
+    samples = np.asarray(audio_data).reshape(-1)
+
+    nbytes = samples.size * 2
+    buf = bytearray(_WAV_HEADER.size + nbytes)
+    # RIFF chunk, fmt chunk (PCM, mono, 16-bit), data chunk header
+    header = (b"RIFF", 36 + nbytes, b"WAVE", b"fmt ", 16, 1, 1, sample_rate, sample_rate * 2, 2, 16, b"data", nbytes)
+    _WAV_HEADER.pack_into(buf, 0, *header)
+    pcm = np.frombuffer(buf, dtype="<i2", offset=_WAV_HEADER.size)
+    if samples.dtype == np.int16:
+        pcm[:] = samples
+    else:
+        # Round to nearest like soundfile's float -> PCM_16 conversion; a plain int cast would truncate
+        pcm[:] = np.rint(np.clip(samples.astype(np.float32, copy=False), -1.0, 1.0) * 32767)
+    return buf
+
+
 class OptimizedS3Uploader:
-    """Optimized S3 uploader"""
+    """Optimized S3 uploader (non-blocking, via aiobotocore)"""
 
     def __init__(self):
+        self.session = None
         self.s3_client = None
+        self._client_stack = contextlib.AsyncExitStack()
         self._init_client()
 
     def _init_client(self):
-        """Initialize S3 client"""
+        """Initialize S3 session"""
         try:
-            self.s3_client = boto3.client(
-                "s3",
-                aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-                aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
-                region_name=os.getenv("AWS_DEFAULT_REGION", "us-east-1"),
-            )
+            self.session = get_session()
         except Exception as e:
             logger.error(f"S3 client init failed: {e}")
 
-    async def upload_audio(self, audio_data, sample_rate: int, bucket: str, key: str) -> str:
+    def _create_client(self):
+        return self.session.create_client(
+            "s3",
+            aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
+            aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
+            region_name=os.getenv("AWS_DEFAULT_REGION", "us-east-1"),
+        )
+
+    async def _get_client(self):
+        """Open the S3 client once and keep its connection pool for later uploads"""
+        if self.s3_client is None:
+            self.s3_client = await self._client_stack.enter_async_context(self._create_client())
+        return self.s3_client
+
+    async def upload_audio(
+        self, audio_data, sample_rate: int, bucket: str, key: str, ready: torch.cuda.Event | None = None
+    ) -> str:
         """Upload audio to S3"""
         try:
-            audio_bytes = BytesIO()
-            sf.write(audio_bytes, audio_data, sample_rate)
-            audio_bytes.seek(0)
+            body = encode_wav_pcm16(audio_data, sample_rate, ready)
 
-            self.s3_client.put_object(Bucket=bucket, Key=key, Body=audio_bytes.getvalue(), ContentType="audio/wav")
+            s3_client = await self._get_client()
+            if len(body) <= S3_MULTIPART_CHUNK_SIZE:
+                await s3_client.put_object(Bucket=bucket, Key=key, Body=body, ContentType="audio/wav")
+            else:
+                await self._upload_multipart(s3_client, memoryview(body), bucket, key)
 
             return f"s3://{bucket}/{key}"
         except Exception as e:
             logger.error(f"S3 upload failed: {e}")
             raise
 
+    async def _upload_multipart(self, s3_client, body: memoryview, bucket: str, key: str):
+        """Upload body as concurrent multipart parts, aborting the upload on failure"""
+        upload = await s3_client.create_multipart_upload(Bucket=bucket, Key=key, ContentType="audio/wav")
+        upload_id = upload["UploadId"]
+
+        async def upload_part(part_number: int, offset: int) -> dict:
+            part = await s3_client.upload_part(
+                Bucket=bucket,
+                Key=key,
+                UploadId=upload_id,
+                PartNumber=part_number,
+                Body=bytes(body[offset : offset + S3_MULTIPART_CHUNK_SIZE]),
+            )
+            return {"PartNumber": part_number, "ETag": part["ETag"]}
+
+        try:
+            parts = await asyncio.gather(
+                *(
+                    upload_part(part_number, offset)
+                    for part_number, offset in enumerate(range(0, len(body), S3_MULTIPART_CHUNK_SIZE), start=1)
+                )
+            )
+            await s3_client.complete_multipart_upload(
+                Bucket=bucket, Key=key, UploadId=upload_id, MultipartUpload={"Parts": parts}
+            )
+        except Exception:
+            await s3_client.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id)
+            raise
+
 
 class OptimizedAudioGenerator:
     """Optimized audio generation"""
 
     def __init__(self, model_manager: OptimizedModelManager):
         self.model_manager = model_manager
+        self._pinned_audio = None  # reused host staging buffer for device -> host audio copies
 
     async def generate_audio(self, request: OptimizedGenerationRequest) -> dict[str, Any]:
         """Generate audio with optimized workflow"""
@@ -163,10 +317,7 @@ class OptimizedAudioGenerator:
         messages = self._build_messages(request.scene_prompt, request.ref_audio)
 
         # Generate audio with memory optimization
-        with torch.no_grad():
-            if "cuda" in self.model_manager.device:
-                torch.cuda.empty_cache()
-
+        with torch.inference_mode():
             # Use model.generate() directly with bfloat16 precision
             inputs = {
                 "messages": messages,
@@ -182,27 +333,41 @@ class OptimizedAudioGenerator:
             audio_data = outputs.get("audio", torch.tensor([]))
             text_output = outputs.get("text", normalized_text)
 
+            audio_ready = None
+            if isinstance(audio_data, torch.Tensor) and audio_data.is_cuda:
+                audio_data, audio_ready = self._stage_audio_to_host(audio_data)
+
         return {
             "audio_data": audio_data,
+            "audio_ready": audio_ready,
             "sample_rate": 24000,
             "text_output": text_output,
             "duration_seconds": len(audio_data) / 24000 if len(audio_data) > 0 else 0.0,
         }
 
+    def _stage_audio_to_host(self, audio: torch.Tensor) -> tuple[torch.Tensor, torch.cuda.Event]:
+        """Quantize to int16 on the device and start an async copy into the pinned host buffer"""
+        audio_int16 = (audio.reshape(-1).float().clamp(-1.0, 1.0) * 32767).round().to(torch.int16)
+        num_samples = audio_int16.numel()
+        if self._pinned_audio is None or self._pinned_audio.numel() < num_samples:
+            self._pinned_audio = torch.empty(num_samples, dtype=torch.int16, pin_memory=True)
+        host_audio = self._pinned_audio[:num_samples]
+        host_audio.copy_(audio_int16, non_blocking=True)
+        copied = torch.cuda.Event()
+        copied.record()
+        return host_audio, copied
+
     def _normalize_text(self, text: str) -> str:
         """Optimized text normalization"""
         # Basic cleaning
-        text = text.replace("(", " ").replace(")", " ")
-        text = text.replace("°F", " degrees Fahrenheit")
-        text = text.replace("°C", " degrees Celsius")
+        text = _NORMALIZE_RE.sub(lambda m: _NORMALIZE_REPLACEMENTS[m.group(0)], text)
 
         # Clean up lines
-        lines = text.split("\n")
-        text = "\n".join([" ".join(line.split()) for line in lines if line.strip()])
-        text = text.strip()
+        text = _LINE_BREAK_RE.sub("\n", text)
+        text = _INLINE_SPACE_RE.sub(" ", text).strip()
 
         # Add period if needed
-        if text and not any([text.endswith(c) for c in [".", "!", "?", ",", ";", '"', "'"]]):
+        if text and not text.endswith(_ENDING):
             text += "."
 
         return text
@@ -250,6 +415,7 @@ class OptimizedHandler:
         self.s3_uploader = OptimizedS3Uploader()
         self.audio_generator = OptimizedAudioGenerator(self.model_manager)
         self.validator = OptimizedValidator()
+        self.requests_since_cleanup = 0
 
     async def handle_generation(self, event: dict) -> dict:
         """Handle generation request"""
@@ -259,11 +425,7 @@ class OptimizedHandler:
             # Validate input
             is_valid, errors = self.validator.validate_request(input_data)
             if not is_valid:
-                return {
-                    "output": OptimizedGenerationResponse(
-                        success=False, error=f"Validation failed: {'; '.join(errors)}"
-                    ).__dict__
-                }
+                return {"output": _error_response(f"Validation failed: {'; '.join(errors)}")}
 
             # Create optimized request
             request = OptimizedGenerationRequest(**input_data)
@@ -271,28 +433,27 @@ class OptimizedHandler:
             # Generate audio
             generation_result = await self.audio_generator.generate_audio(request)
 
-            # Handle S3 upload if requested
-            audio_url = None
+            # Start the S3 upload now so it overlaps with response assembly and cleanup
+            upload_task = None
             if request.s3_bucket and request.s3_key:
-                try:
-                    audio_url = await self.s3_uploader.upload_audio(
+                upload_task = asyncio.create_task(
+                    self.s3_uploader.upload_audio(
                         generation_result["audio_data"],
                         generation_result["sample_rate"],
                         request.s3_bucket,
                         request.s3_key,
+                        generation_result["audio_ready"],
                     )
-                except Exception as e:
-                    logger.warning(f"S3 upload failed: {e}")
-                    # Continue without S3
+                )
 
             # Prepare response
-            response = OptimizedGenerationResponse(
-                success=True,
-                audio_url=audio_url,
-                duration_seconds=generation_result["duration_seconds"],
-                sample_rate=generation_result["sample_rate"],
-                text_output=generation_result["text_output"],
-                metadata={
+            response = {
+                "success": True,
+                "audio_url": None,
+                "duration_seconds": generation_result["duration_seconds"],
+                "sample_rate": generation_result["sample_rate"],
+                "text_output": generation_result["text_output"],
+                "metadata": {
                     "model_used": MODEL_PATH,
                     "voice_clone": request.ref_audio,
                     "generation_parameters": {
@@ -301,16 +462,27 @@ class OptimizedHandler:
                         "top_p": request.top_p,
                     },
                 },
-            )
+                "error": None,
+            }
+
+            # Memory cleanup every N requests
+            self.requests_since_cleanup += 1
+            if self.requests_since_cleanup >= CLEANUP_EVERY_N_REQUESTS:
+                self.model_manager.cleanup_memory()
+                self.requests_since_cleanup = 0
 
-            # Memory cleanup
-            self.model_manager.cleanup_memory()
+            if upload_task is not None:
+                try:
+                    response["audio_url"] = await upload_task
+                except Exception as e:
+                    logger.warning(f"S3 upload failed: {e}")
+                    # Continue without S3
 
-            return {"output": response.__dict__}
+            return {"output": response}
 
         except Exception as e:
             logger.error(f"Generation failed: {e}")
-            return {"output": OptimizedGenerationResponse(success=False, error=f"Generation error: {str(e)}").__dict__}
+            return {"output": _error_response(f"Generation error: {str(e)}")}
 
     async def handle_health(self) -> dict:
         """Handle health check"""
@@ -318,29 +490,17 @@ class OptimizedHandler:
             # Validate virtual environment setup
             venv_path = "/runpod-volume/higgs"
             venv_python = f"{venv_path}/bin/python"
-            
+
             # Check if virtual environment exists and is accessible
             venv_valid = (
-                os.path.exists(venv_path) and 
-                os.path.exists(venv_python) and
-                sys.path[0].startswith(venv_path) and
-                os.environ.get("VIRTUAL_ENV") == venv_path
+                os.path.exists(venv_path)
+                and os.path.exists(venv_python)
+                and sys.path[0].startswith(venv_path)
+                and os.environ.get("VIRTUAL_ENV") == venv_path
             )
-            
-            # Check if Python packages are accessible in virtual environment
-            packages_accessible = True
-            try:
-                import torch
-                import soundfile
-                import transformers
-                import loguru
-                logger.info(f"Virtual environment packages accessible - PyTorch: {torch.__version__}")
-            except ImportError as e:
-                packages_accessible = False
-                logger.error(f"Virtual environment package access failed: {e}")
-            
-            health_status = "healthy" if (venv_valid and packages_accessible) else "unhealthy"
-            
+
+            health_status = "healthy" if (venv_valid and _PACKAGES_OK) else "unhealthy"
+
             return {
                 "status": health_status,
                 "timestamp": time.time(),
@@ -350,10 +510,11 @@ class OptimizedHandler:
                 "virtual_environment": {
                     "valid": venv_valid,
                     "path": venv_path,
-                    "packages_accessible": packages_accessible,
+                    "packages_accessible": _PACKAGES_OK,
+                    "torch_version": torch.__version__,
                     "sys_path_prefix": sys.path[0],
-                    "virtual_env_var": os.environ.get("VIRTUAL_ENV")
-                }
+                    "virtual_env_var": os.environ.get("VIRTUAL_ENV"),
+                },
             }
         except Exception as e:
             return {"status": "unhealthy", "error": str(e), "timestamp": time.time()}
@@ -362,6 +523,17 @@ class OptimizedHandler:
 # Global optimized handler
 optimized_handler = OptimizedHandler()
 
+# One event loop for the life of the worker; the S3 client's connection pool is bound to it
+_LOOP = asyncio.new_event_loop()
+asyncio.set_event_loop(_LOOP)
+
+# Load (and compile) at container start so the first request does not pay for it
+if WARMUP_ON_IMPORT:
+    try:
+        _LOOP.run_until_complete(optimized_handler.model_manager.initialize())
+    except Exception as e:
+        logger.error(f"Model load at startup failed, models will load on first request: {e}")
+
 
 async def handler(event: dict) -> dict:
     """Main handler for RunPod serverless - optimized version"""
@@ -375,13 +547,11 @@ async def handler(event: dict) -> dict:
 
 def run_handler(event: dict) -> dict:
     """Synchronous wrapper for RunPod"""
-    import asyncio
-
     try:
-        return asyncio.run(handler(event))
+        return _LOOP.run_until_complete(handler(event))
     except Exception as e:
         logger.error(f"Handler execution failed: {e}")
-        return {"output": OptimizedGenerationResponse(success=False, error=f"Handler error: {str(e)}").__dict__}
+        return {"output": _error_response(f"Handler error: {str(e)}")}
 
 
 if __name__ == "__main__":